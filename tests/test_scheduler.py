@@ -0,0 +1,88 @@
+"""
+Tests for the adaptive poll scheduler.
+
+:copyright: (c) 2025 by Meir Miyara.
+:license: MPL-2.0, see LICENSE for more details.
+"""
+
+import random
+import unittest
+
+from uc_intg_steam.scheduler import AdaptivePollScheduler
+
+# Change timestamps whose 99th-percentile gap puts a schedule point one ulp below
+# the upper bound, which rounds into the bin past the last one
+UPPER_EDGE_CHANGES = [
+    0.21, 44.11684507997682, 44.32684507997682, 44.53684507997682, 186.440560679557,
+    205.65721559479374, 454.92522019512876, 455.0352201951288, 456.7552201951288,
+    459.8852201951288, 489.63365456904813, 493.85365456904816, 495.17365456904815,
+    498.55365456904815, 547.2840171107867, 550.1440171107868, 554.5740171107867,
+    784.6759605880785, 784.7859605880785, 784.9959605880786, 785.2059605880786,
+    785.4559605880786, 785.5659605880786, 785.6759605880786, 836.1102367655229,
+]
+
+
+class AdaptivePollSchedulerTest(unittest.TestCase):
+    """Adaptive poll scheduler tests."""
+
+    def test_no_delay_without_history(self):
+        scheduler = AdaptivePollScheduler(30)
+        scheduler.record_poll(True, now=0.0)
+        self.assertIsNone(scheduler.next_delay(now=1.0))
+
+    def test_changes_at_upper_bin_edge(self):
+        scheduler = AdaptivePollScheduler(30)
+        for now in UPPER_EDGE_CHANGES:
+            scheduler.record_poll(True, now=now)
+
+        delay = scheduler.next_delay(now=860.8453893545711)
+        self.assertGreaterEqual(delay, scheduler.min_interval)
+        self.assertLessEqual(delay, scheduler.max_interval)
+
+    def test_random_histories_stay_within_bounds(self):
+        rng = random.Random(1)
+        for _ in range(3000):
+            scheduler = AdaptivePollScheduler(30)
+            now = 0.0
+            for _ in range(25):
+                now += rng.choice([rng.uniform(1, 300), round(rng.uniform(0.1, 5), 2), 0.11, 0.21])
+                scheduler.record_poll(True, now=now)
+
+            delay = scheduler.next_delay(now=now + rng.uniform(0, 50))
+            self.assertGreaterEqual(delay, scheduler.min_interval)
+            self.assertLessEqual(delay, scheduler.max_interval)
+
+    def test_polls_per_hour_within_fixed_interval_budget(self):
+        base_interval = 30
+        hours = 24
+        for seed in range(3):
+            rng = random.Random(seed)
+            changes = []
+            now = 0.0
+            while now < hours * 3600:
+                now += rng.expovariate(1 / 120)
+                changes.append(now)
+
+            scheduler = AdaptivePollScheduler(base_interval, max_interval=120)
+            now = 0.0
+            polls = 0
+            pending = 0
+            while now < hours * 3600:
+                polls += 1
+                changed = False
+                while pending < len(changes) and changes[pending] <= now:
+                    pending += 1
+                    changed = True
+                scheduler.record_poll(changed, now=now)
+
+                delay = scheduler.next_delay(now=now)
+                if delay is None:
+                    delay = base_interval
+                self.assertGreaterEqual(delay, base_interval)
+                now += delay
+
+            self.assertLessEqual(polls / hours, 3600 / base_interval)
+
+
+if __name__ == "__main__":
+    unittest.main()
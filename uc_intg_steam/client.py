@@ -6,21 +6,155 @@ Steam API client with caching mechanism similar to Xbox Live integration.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
+import os
+import random
+import time
+from collections import OrderedDict
 from typing import Any, Optional
+
+import aiofiles
 import aiohttp
-from asyncio_throttle import Throttler
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 _LOG = logging.getLogger(__name__)
 
-# Global cache for game artwork - similar to Xbox Live's ARTWORK_CACHE
-STEAM_ARTWORK_CACHE = {}
-STEAM_DATA_CACHE = {
-    "currently_playing": None,
-    "friends_data": None,
-    "last_update": 0
+
+class LRUCache(OrderedDict):
+    """Dictionary that evicts its least recently used entries beyond maxsize."""
+
+    def __init__(self, maxsize: int = 512):
+        """Initialize LRU cache."""
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        """Get entry and mark it as most recently used."""
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        """Get entry, marking it as most recently used, or default."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        """Set entry and evict the oldest entries beyond maxsize."""
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+# Global cache for game artwork keyed by appid - similar to Xbox Live's ARTWORK_CACHE.
+# Process-wide on purpose: artwork URLs do not depend on the account, and all access
+# happens on the event loop thread.
+STEAM_ARTWORK_CACHE = LRUCache(maxsize=512)
+ARTWORK_CACHE_FILE = "artwork_cache.json"
+ARTWORK_FLUSH_INTERVAL = 60
+
+# The friend list rarely changes, player summaries are volatile
+FRIEND_IDS_TTL = 3600
+# Friend summaries not refreshed within a few poll intervals are dropped, not reported stale
+FRIEND_SUMMARY_MAX_AGE = 360
+
+# Conditional request entries kept per client
+HTTP_CACHE_SIZE = 32
+
+# Persona state names indexed by Steam's personastate value
+_PERSONA_STATES = ("Offline", "Online", "Busy", "Away", "Snooze", "Looking to trade", "Looking to play")
+
+# Retry policy for transient Steam errors
+MAX_REQUEST_ATTEMPTS = 4
+MAX_RETRY_DELAY = 10
+MAX_RETRY_AFTER = 30
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+_STATUS_ERRORS = {
+    401: "Invalid API key",
+    403: "Access denied - check Steam ID and privacy settings"
 }
 
+# Shared HTTP session - every request goes to the same Steam host
+_SESSION: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Get the shared HTTP session, creating it on first use."""
+    global _SESSION
+
+    if _SESSION is None or _SESSION.closed:
+        connector = aiohttp.TCPConnector(
+            limit=8,
+            limit_per_host=4,
+            keepalive_timeout=75,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        _SESSION = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+        _LOG.debug("Shared Steam HTTP session created")
+
+    return _SESSION
+
+
+async def close_session() -> None:
+    """Close the shared HTTP session."""
+    global _SESSION
+
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+        _LOG.debug("Shared Steam HTTP session closed")
+
+
+class AsyncTokenBucket:
+    """Token bucket rate limiter allowing short bursts of concurrent requests."""
+
+    def __init__(self, capacity: int = 10, refill_rate: float = 5.0):
+        """Initialize token bucket."""
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    async def acquire(self, weight: int = 1) -> None:
+        """Wait until enough tokens are available and consume them."""
+        # The bucket is a module-level singleton, so bind the lock to whichever loop is running now
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+
+        # Waiters queue on the lock, the holder sleeps until its tokens have refilled
+        async with self._lock:
+            self._refill()
+            if self._tokens < weight:
+                await asyncio.sleep((weight - self._tokens) / self.refill_rate)
+                self._refill()
+            self._tokens -= weight
+
+
+# Shared rate limiter - Steam limits per API key, not per client
+_RATE_LIMITER = AsyncTokenBucket(capacity=10, refill_rate=5.0)
+
 
 class SteamAPIError(Exception):
     """Steam API error."""
@@ -30,13 +164,38 @@ class SteamAPIError(Exception):
 class SteamClient:
     """Steam API client with Xbox Live-style caching."""
 
-    def __init__(self, api_key: str, steam_id: str):
+    def __init__(
+        self,
+        api_key: str,
+        steam_id: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        config_dir: Optional[str] = None
+    ):
         """Initialize Steam client."""
         self.api_key = api_key
         self.steam_id = steam_id
-        self.base_url = "http://api.steampowered.com"
-        self.session: Optional[aiohttp.ClientSession] = None
-        self.throttler = Throttler(rate_limit=1, period=1)
+        self.base_url = "https://api.steampowered.com"
+        self._base_params = {"key": api_key, "format": "json"}
+        self._endpoint_urls: dict[str, str] = {}
+        self._cache: dict[str, Any] = {
+            "currently_playing": None,
+            "friends_data": None,
+            "friend_ids": None,
+            "friend_ids_ts": 0.0,
+            "friend_ids_fingerprint": None,
+            "friend_summaries": {}
+        }
+        # Conditional request validators per endpoint+params: key -> (etag, last_modified, data).
+        # Bounded because friend batches rotate through many distinct steamids params.
+        self._http_cache = LRUCache(maxsize=HTTP_CACHE_SIZE)
+        self.session: Optional[aiohttp.ClientSession] = session
+        self.rate_limiter = _RATE_LIMITER
+        # Refreshes in a row that hit an API error, repeats are logged at debug
+        self._consecutive_failures = 0
+        self._artwork_cache_file = os.path.join(config_dir, ARTWORK_CACHE_FILE) if config_dir else None
+        self._artwork_cache_dirty = False
+        self._artwork_last_flush = 0.0
+        self._artwork_cache_loaded = False
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -48,47 +207,134 @@ class SteamClient:
         await self.disconnect()
 
     async def connect(self):
-        """Create HTTP session."""
-        if not self.session:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
-            _LOG.debug("Steam client session created")
+        """Attach to the injected or shared HTTP session."""
+        if not self.session or self.session.closed:
+            self.session = get_session()
+            _LOG.debug("Steam client attached to shared session")
+
+        if not self._artwork_cache_loaded:
+            await self._load_artwork_cache()
 
     async def disconnect(self):
-        """Close HTTP session."""
-        if self.session:
-            await self.session.close()
-            self.session = None
-            _LOG.debug("Steam client session closed")
+        """Detach from the HTTP session, which stays open for other users until close_session()."""
+        await self._maybe_flush_cache(force=True)
+        self.session = None
+
+    async def _load_artwork_cache(self) -> None:
+        """Load persisted artwork URLs into the global cache."""
+        self._artwork_cache_loaded = True
+        if not self._artwork_cache_file:
+            return
+
+        try:
+            async with aiofiles.open(self._artwork_cache_file, "r", encoding="utf-8") as file:
+                data = json.loads(await file.read())
+            STEAM_ARTWORK_CACHE.update({str(appid): url for appid, url in data.items()})
+            _LOG.debug("Loaded %d cached artwork URLs", len(data))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            _LOG.warning("Could not load artwork cache: %s", e)
+
+    async def _maybe_flush_cache(self, force: bool = False) -> None:
+        """Write the artwork cache to disk, at most once per flush interval."""
+        if not self._artwork_cache_file or not self._artwork_cache_dirty:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._artwork_last_flush < ARTWORK_FLUSH_INTERVAL:
+            return
+
+        # Snapshot and claim the flush before awaiting so concurrent callers do not write twice
+        data = dict(STEAM_ARTWORK_CACHE)
+        self._artwork_cache_dirty = False
+        self._artwork_last_flush = now
+        tmp_file = self._artwork_cache_file + ".tmp"
+
+        try:
+            await asyncio.to_thread(os.makedirs, os.path.dirname(self._artwork_cache_file), exist_ok=True)
+            async with aiofiles.open(tmp_file, "w", encoding="utf-8") as file:
+                await file.write(json.dumps(data))
+            await asyncio.to_thread(os.replace, tmp_file, self._artwork_cache_file)
+            _LOG.debug("Artwork cache written to %s", self._artwork_cache_file)
+        except Exception as e:
+            self._artwork_cache_dirty = True
+            _LOG.warning("Could not write artwork cache: %s", e)
 
     async def _make_request(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
         """Make throttled API request with better error handling."""
         if not self.session:
             await self.connect()
 
-        params.update({"key": self.api_key, "format": "json"})
-        url = f"{self.base_url}/{endpoint}"
+        url = self._endpoint_urls.get(endpoint)
+        if url is None:
+            url = self._endpoint_urls[endpoint] = f"{self.base_url}/{endpoint}"
+        params = {**self._base_params, **params}
+
+        cache_key = (endpoint, tuple(sorted(params.items())))
+        cached = self._http_cache.get(cache_key)
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        error: Optional[SteamAPIError] = None
 
-        async with self.throttler:
+        for attempt in range(MAX_REQUEST_ATTEMPTS):
+            retry_after: Optional[float] = None
             try:
+                await self.rate_limiter.acquire(weight=1)
                 _LOG.debug("Making Steam API request: %s", endpoint)
-                async with self.session.get(url, params=params) as response:
+                async with self.session.get(url, params=params, headers=headers) as response:
                     if response.status == 200:
-                        return await response.json()
-                    elif response.status == 401:
-                        raise SteamAPIError("Invalid API key")
-                    elif response.status == 403:
-                        raise SteamAPIError("Access denied - check Steam ID and privacy settings")
-                    elif response.status in [502, 503, 504]:
-                        # Steam server errors - use cached data if available
-                        raise SteamAPIError(f"Steam servers temporarily unavailable (HTTP {response.status})")
+                        data = _json_loads(await response.read())
+                        etag = response.headers.get("ETag")
+                        last_modified = response.headers.get("Last-Modified")
+                        if etag or last_modified:
+                            self._http_cache[cache_key] = (etag, last_modified, data)
+                        return data
+                    elif response.status == 304 and cached:
+                        _LOG.debug("Steam API %s not modified, using cached response", endpoint)
+                        return cached[2]
+                    elif response.status in _RETRYABLE_STATUSES:
+                        # Transient Steam server errors - retry, callers fall back to cache if all attempts fail
+                        retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+                        error = SteamAPIError(f"Steam servers temporarily unavailable (HTTP {response.status})")
                     else:
-                        raise SteamAPIError(f"API request failed with status {response.status}")
-            except aiohttp.ClientError as e:
-                raise SteamAPIError(f"Network error: {e}")
+                        message = _STATUS_ERRORS.get(response.status)
+                        raise SteamAPIError(message or f"API request failed with status {response.status}")
+            except SteamAPIError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = SteamAPIError(f"Network error: {e}")
             except Exception as e:
                 raise SteamAPIError(f"Unexpected error: {e}")
 
+            if attempt == MAX_REQUEST_ATTEMPTS - 1:
+                break
+
+            if retry_after is not None:
+                delay = min(retry_after, MAX_RETRY_AFTER)
+            else:
+                delay = min(2 ** attempt + random.random(), MAX_RETRY_DELAY)
+            _LOG.debug("Steam API %s failed (%s), retrying in %.1fs", endpoint, error, delay)
+            await asyncio.sleep(delay)
+
+        raise error
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
     async def get_player_summaries(self, steam_ids: Optional[list[str]] = None) -> dict[str, Any]:
         """Get player summaries."""
         if steam_ids is None:
@@ -113,135 +359,215 @@ class SteamClient:
             else:
                 raise
 
-    async def get_currently_playing(self) -> tuple[Optional[dict[str, Any]], Optional[str]]:
-        """Get currently playing game with caching to prevent flickering."""
-        try:
-            data = await self.get_player_summaries()
+    def _process_currently_playing(self, player: dict[str, Any]) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """Build and cache the currently playing result from the owner's player summary."""
+        if "gameid" in player and "gameextrainfo" in player:
+            game_name = player["gameextrainfo"]
+            appid = player["gameid"]
             
-            if "response" not in data or "players" not in data["response"]:
-                # Return cached data if API fails
-                if STEAM_DATA_CACHE["currently_playing"]:
-                    _LOG.debug("Using cached currently playing data due to API issues")
-                    return STEAM_DATA_CACHE["currently_playing"]
-                return None, None
-                
-            players = data["response"]["players"]
-            if not players:
-                if STEAM_DATA_CACHE["currently_playing"]:
-                    _LOG.debug("Using cached data - no players returned")
-                    return STEAM_DATA_CACHE["currently_playing"]
-                return None, None
-                
-            player = players[0]
+            # Check cache for artwork URL first (like Xbox Live does)
+            image_url = STEAM_ARTWORK_CACHE.get(appid)
+            if image_url is None:
+                # Cache the Steam CDN URL for this game
+                image_url = STEAM_ARTWORK_CACHE.setdefault(
+                    appid, f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/library_600x900.jpg"
+                )
+                self._artwork_cache_dirty = True
+                _LOG.debug("Cached new artwork URL for '%s': %s", game_name, image_url)
             
-            if "gameid" in player and "gameextrainfo" in player:
-                game_name = player["gameextrainfo"]
-                appid = player["gameid"]
-                
-                # Check cache for artwork URL first (like Xbox Live does)
-                if game_name in STEAM_ARTWORK_CACHE:
-                    image_url = STEAM_ARTWORK_CACHE[game_name]
-                    _LOG.debug(f"Using cached artwork for '{game_name}'")
-                else:
-                    # Cache the Steam CDN URL for this game
-                    image_url = f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/library_600x900.jpg"
-                    STEAM_ARTWORK_CACHE[game_name] = image_url
-                    _LOG.debug(f"Cached new artwork URL for '{game_name}': {image_url}")
-                
-                game_data = {
-                    "appid": appid,
-                    "name": game_name,
-                    "personastate": player.get("personastate", 0)
-                }
-                
-                result = (game_data, image_url)
-                
-                # Cache the successful result (like Xbox Live pattern)
-                STEAM_DATA_CACHE["currently_playing"] = result
-                return result
-            else:
-                # User not playing - cache this state too
-                result = (None, None)
-                STEAM_DATA_CACHE["currently_playing"] = result
-                return result
-                
-        except SteamAPIError as e:
-            if "temporarily unavailable" in str(e) or "502" in str(e) or "503" in str(e):
-                # Use cache during temporary Steam server issues (like Xbox Live does)
-                if STEAM_DATA_CACHE["currently_playing"]:
-                    _LOG.debug(f"Using cached data due to Steam server issues: {e}")
-                    return STEAM_DATA_CACHE["currently_playing"]
-                else:
-                    _LOG.warning("Steam servers temporarily unavailable and no cache available")
-                    return None, None
+            game_data = {
+                "appid": appid,
+                "name": game_name,
+                "personastate": player.get("personastate", 0)
+            }
+            
+            result = (game_data, image_url)
+            
+            # Cache the successful result (like Xbox Live pattern)
+            self._cache["currently_playing"] = result
+            return result
+        else:
+            # User not playing - cache this state too
+            result = (None, None)
+            self._cache["currently_playing"] = result
+            return result
+
+    def _currently_playing_fallback(self, e: SteamAPIError) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """Get currently playing result to report after an API error."""
+        if "temporarily unavailable" in str(e) or "502" in str(e) or "503" in str(e):
+            # Use cache during temporary Steam server issues (like Xbox Live does)
+            if self._cache["currently_playing"]:
+                _LOG.debug("Using cached data due to Steam server issues: %s", e)
+                return self._cache["currently_playing"]
             else:
-                _LOG.error("Error getting currently playing game: %s", e)
+                self._log_failure(logging.WARNING, "Steam servers temporarily unavailable and no cache available")
                 return None, None
-        except Exception as e:
-            _LOG.error("Unexpected error getting currently playing game: %s", e)
+        else:
+            self._log_failure(logging.ERROR, "Error getting currently playing game: %s", e)
             return None, None
 
-    async def get_online_friends(self) -> list[dict[str, Any]]:
-        """Get list of online friends with caching."""
-        try:
-            friends_data = await self.get_friend_list()
-            
-            if "friendslist" not in friends_data or "friends" not in friends_data["friendslist"]:
-                # Use cache if API fails (like Xbox Live pattern)
-                if STEAM_DATA_CACHE["friends_data"]:
-                    _LOG.debug("Using cached friends data due to API issues")
-                    return STEAM_DATA_CACHE["friends_data"]
-                _LOG.info("No friends list data available")
-                return []
-                
-            friend_steam_ids = [friend["steamid"] for friend in friends_data["friendslist"]["friends"]]
-            
-            if not friend_steam_ids:
-                result = []
-                STEAM_DATA_CACHE["friends_data"] = result
+    def _online_friends_fallback(self, e: SteamAPIError) -> list[dict[str, Any]]:
+        """Get online friends to report after an API error."""
+        if "temporarily unavailable" in str(e) or "502" in str(e) or "503" in str(e):
+            if self._cache["friends_data"]:
+                _LOG.debug("Using cached friends due to Steam server issues")
+                return self._cache["friends_data"]
+        self._log_failure(logging.ERROR, "Error getting online friends: %s", e)
+        return []
+
+    async def refresh_all(
+        self,
+        include_playing: bool = True,
+        include_friends: bool = True
+    ) -> tuple[tuple[Optional[dict[str, Any]], Optional[str]], list[dict[str, Any]]]:
+        """Get currently playing game and online friends from a single round of summary requests.
+
+        Parts that are not included are skipped entirely and reported as empty.
+        """
+        failed = False
+        friend_steam_ids = None
+        if include_friends:
+            try:
+                friend_steam_ids = await self._get_friend_ids()
+            except SteamAPIError as e:
+                self._log_failure(logging.WARNING, "Could not refresh friend list: %s", e)
+                failed = True
+
+        # The owner rides along in the first friend batch instead of needing a call of its own
+        steam_ids = [self.steam_id] if include_playing else []
+        if friend_steam_ids:
+            steam_ids.extend(steam_id for steam_id in friend_steam_ids if steam_id != self.steam_id)
+
+        players = {}
+        if steam_ids:
+            try:
+                players = await self._fetch_players(steam_ids)
+            except SteamAPIError as e:
+                result = (
+                    self._currently_playing_fallback(e) if include_playing else (None, None),
+                    self._online_friends_fallback(e) if include_friends else []
+                )
+                self._record_refresh(failed=True)
                 return result
-                
-            batch_size = 100
-            all_online_friends = []
-            
-            for i in range(0, len(friend_steam_ids), batch_size):
-                batch_ids = friend_steam_ids[i:i + batch_size]
-                
-                try:
-                    summaries_data = await self.get_player_summaries(batch_ids)
-                    
-                    if "response" not in summaries_data or "players" not in summaries_data["response"]:
-                        continue
-                        
-                    for player in summaries_data["response"]["players"]:
-                        if player.get("personastate", 0) > 0:
-                            friend_info = {
-                                "steamid": player["steamid"],
-                                "personaname": player.get("personaname", "Unknown"),
-                                "personastate": player.get("personastate", 0),
-                                "gameextrainfo": player.get("gameextrainfo", None),
-                                "gameid": player.get("gameid", None)
-                            }
-                            all_online_friends.append(friend_info)
-                            
-                except Exception as e:
-                    _LOG.error("Error processing friend batch: %s", e)
-                    continue
-            
-            # Cache successful result (like Xbox Live)
-            STEAM_DATA_CACHE["friends_data"] = all_online_friends
-            return all_online_friends
-            
-        except SteamAPIError as e:
-            if "temporarily unavailable" in str(e) or "502" in str(e) or "503" in str(e):
-                if STEAM_DATA_CACHE["friends_data"]:
-                    _LOG.debug("Using cached friends due to Steam server issues")
-                    return STEAM_DATA_CACHE["friends_data"]
-            _LOG.error("Error getting online friends: %s", e)
-            return []
-        except Exception as e:
-            _LOG.error("Unexpected error getting online friends: %s", e)
-            return []
+
+        currently_playing = (None, None)
+        if include_playing:
+            owner = players.pop(self.steam_id, None)
+            if owner:
+                currently_playing = self._process_currently_playing(owner)
+                await self._maybe_flush_cache()
+            else:
+                _LOG.debug("Using cached currently playing data - owner not returned")
+                currently_playing = self._cache["currently_playing"] or (None, None)
+
+        online_friends = []
+        if include_friends:
+            if friend_steam_ids is None:
+                online_friends = self._cache["friends_data"] or []
+            elif not friend_steam_ids:
+                self._cache["friends_data"] = online_friends
+            else:
+                online_friends = self._update_friend_summaries(players)
+
+        self._record_refresh(failed)
+        return currently_playing, online_friends
+
+    def _log_failure(self, level: int, msg: str, *args) -> None:
+        """Log a refresh failure, downgrading repeats to debug to avoid log spam."""
+        _LOG.log(logging.DEBUG if self._consecutive_failures else level, msg, *args)
+
+    def _record_refresh(self, failed: bool) -> None:
+        """Track consecutive failed refreshes."""
+        if failed:
+            self._consecutive_failures += 1
+        elif self._consecutive_failures:
+            _LOG.info("Steam API recovered after %d failed refreshes", self._consecutive_failures)
+            self._consecutive_failures = 0
+
+    async def _get_friend_ids(self) -> Optional[list[str]]:
+        """Get friend steam ids, re-fetching the friend list only once the cached copy expires."""
+        now = time.monotonic()
+        friend_steam_ids = self._cache["friend_ids"]
+
+        if friend_steam_ids is not None and now - self._cache["friend_ids_ts"] <= FRIEND_IDS_TTL:
+            return friend_steam_ids
+
+        friends_data = await self.get_friend_list()
+
+        if "friendslist" not in friends_data or "friends" not in friends_data["friendslist"]:
+            return None
+
+        friend_steam_ids = [friend["steamid"] for friend in friends_data["friendslist"]["friends"]]
+        fingerprint = self._fingerprint_ids(friend_steam_ids)
+
+        if fingerprint != self._cache["friend_ids_fingerprint"]:
+            _LOG.debug("Friend list changed, invalidating cached friend summaries")
+            self._cache["friend_summaries"] = {}
+
+        self._cache["friend_ids"] = friend_steam_ids
+        self._cache["friend_ids_ts"] = now
+        self._cache["friend_ids_fingerprint"] = fingerprint
+        return friend_steam_ids
+
+    async def _fetch_players(self, steam_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Fetch player summaries in parallel batches, keyed by steamid."""
+        batch_size = 100
+
+        tasks = [
+            self.get_player_summaries(steam_ids[i:i + batch_size])
+            for i in range(0, len(steam_ids), batch_size)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors and len(errors) == len(results):
+            raise errors[0]
+
+        players = {}
+        for summaries_data in results:
+            if isinstance(summaries_data, Exception):
+                _LOG.error("Error processing friend batch: %s", summaries_data)
+                continue
+
+            if "response" not in summaries_data or "players" not in summaries_data["response"]:
+                continue
+
+            for player in summaries_data["response"]["players"]:
+                players[player["steamid"]] = player
+
+        return players
+
+    def _update_friend_summaries(self, players: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+        """Merge fresh friend summaries into the cache and return the online friends."""
+        now = time.monotonic()
+        # Start from the recent summaries so a failed batch keeps its last known state for a while
+        summaries = {
+            steam_id: entry for steam_id, entry in self._cache["friend_summaries"].items()
+            if now - entry[0] <= FRIEND_SUMMARY_MAX_AGE
+        }
+
+        for steam_id, player in players.items():
+            summaries[steam_id] = (now, {
+                "steamid": steam_id,
+                "personaname": player.get("personaname", "Unknown"),
+                "personastate": player.get("personastate", 0),
+                "gameextrainfo": player.get("gameextrainfo", None),
+                "gameid": player.get("gameid", None),
+                "lastlogoff": player.get("lastlogoff", None)
+            })
+
+        self._cache["friend_summaries"] = summaries
+
+        all_online_friends = [friend for _, friend in summaries.values() if friend["personastate"] > 0]
+
+        # Cache successful result (like Xbox Live)
+        self._cache["friends_data"] = all_online_friends
+        return all_online_friends
+
+    @staticmethod
+    def _fingerprint_ids(steam_ids: list[str]) -> str:
+        """Build an ETag-like fingerprint of a friend id list."""
+        return hashlib.sha1(",".join(sorted(steam_ids)).encode("ascii")).hexdigest()
 
     @staticmethod
     def get_game_image_url(appid: str) -> str:
@@ -251,14 +577,4 @@ class SteamClient:
     @staticmethod
     def get_persona_state_text(state: int) -> str:
         """Convert persona state to readable text."""
-        states = {
-            0: "Offline", 1: "Online", 2: "Busy", 3: "Away",
-            4: "Snooze", 5: "Looking to trade", 6: "Looking to play"
-        }
-        return states.get(state, "Unknown")
-
-    @staticmethod
-    def get_steam_logo_url() -> str:
-        """Get high-resolution Steam logo URL (cached like Xbox Live artwork)."""
-        # Using Steam's official high-res logo from their brand assets
-        return "https://store.steampowered.com/public/shared/images/header/logo_steam.svg"
+        return _PERSONA_STATES[state] if 0 <= state < len(_PERSONA_STATES) else "Unknown"
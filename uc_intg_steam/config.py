@@ -5,11 +5,15 @@ Configuration management for Steam integration.
 :license: MPL-2.0, see LICENSE for more details.
 """
 
+import asyncio
 import json
 import logging
 import os
+from pathlib import Path
 from typing import Any
 
+import aiofiles
+
 _LOG = logging.getLogger(__name__)
 
 
@@ -25,10 +29,10 @@ class SteamConfig:
     async def load(self, api) -> None:
         """Load configuration from API config directory."""
         try:
-            config_file = os.path.join(api.config_dir_path, "config.json")
-            if os.path.exists(config_file):
-                with open(config_file, "r", encoding="utf-8") as file:
-                    data = json.load(file)
+            config_file = Path(api.config_dir_path) / "config.json"
+            if config_file.exists():
+                async with aiofiles.open(config_file, "r", encoding="utf-8") as file:
+                    data = json.loads(await file.read())
                     self.steam_api_key = data.get("steam_api_key", "")
                     self.steam_id = data.get("steam_id", "")
                     self.update_interval = data.get("update_interval", 60)
@@ -41,8 +45,10 @@ class SteamConfig:
     async def save(self, api) -> None:
         """Save configuration to API config directory."""
         try:
-            os.makedirs(api.config_dir_path, exist_ok=True)
-            config_file = os.path.join(api.config_dir_path, "config.json")
+            config_dir = Path(api.config_dir_path)
+            config_dir.mkdir(parents=True, exist_ok=True)
+            config_file = config_dir / "config.json"
+            tmp_file = config_dir / "config.json.tmp"
             
             data = {
                 "steam_api_key": self.steam_api_key,
@@ -50,9 +56,10 @@ class SteamConfig:
                 "update_interval": self.update_interval
             }
             
-            with open(config_file, "w", encoding="utf-8") as file:
-                json.dump(data, file, indent=2)
-                _LOG.info("✅ Configuration saved to %s", config_file)
+            async with aiofiles.open(tmp_file, "w", encoding="utf-8") as file:
+                await file.write(json.dumps(data, indent=2))
+            await asyncio.to_thread(os.replace, tmp_file, config_file)
+            _LOG.info("✅ Configuration saved to %s", config_file)
         except Exception as e:
             _LOG.error("Error saving configuration: %s", e)
             raise
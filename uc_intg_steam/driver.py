@@ -5,24 +5,24 @@ from ucapi import IntegrationAPI, DeviceStates, Events
 
 from uc_intg_steam.config import SteamConfig
 from uc_intg_steam.setup import SteamSetup
-from uc_intg_steam.client import SteamClient
+from uc_intg_steam.client import SteamClient, get_session, close_session
 from uc_intg_steam.media_player import SteamCurrentlyPlayingEntity, SteamFriendsEntity
+from uc_intg_steam.poller import SteamPoller
 
 _LOG = logging.getLogger(__name__)
 UPDATE_INTERVAL_SECONDS = 30
+MAX_UPDATE_INTERVAL_SECONDS = 120
+UPDATE_JITTER_SECONDS = 3
 
-try:
-    loop = asyncio.get_running_loop()
-except RuntimeError:
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-
-API = IntegrationAPI(loop)
+API: IntegrationAPI | None = None
+SETUP_HANDLER: SteamSetup | None = None
 CONFIG = SteamConfig()
 STEAM_CLIENT: SteamClient | None = None
 CURRENTLY_PLAYING_ENTITY: SteamCurrentlyPlayingEntity | None = None
 FRIENDS_ENTITY: SteamFriendsEntity | None = None
 UPDATE_TASK: asyncio.Task | None = None
+POLLER: SteamPoller | None = None
+CONFIGURED_IDS: set[str] = set()
 
 async def on_setup_complete():
     """Called when setup is completed successfully."""
@@ -31,7 +31,7 @@ async def on_setup_complete():
 
 async def connect_and_start_client():
     """Initialize Steam client and entities."""
-    global STEAM_CLIENT, CURRENTLY_PLAYING_ENTITY, FRIENDS_ENTITY
+    global STEAM_CLIENT, CURRENTLY_PLAYING_ENTITY, FRIENDS_ENTITY, POLLER
     
     if not CONFIG.steam_api_key or not CONFIG.steam_id:
         _LOG.error("Missing configuration, cannot connect")
@@ -41,7 +41,9 @@ async def connect_and_start_client():
     try:
         STEAM_CLIENT = SteamClient(
             api_key=CONFIG.steam_api_key,
-            steam_id=CONFIG.steam_id
+            steam_id=CONFIG.steam_id,
+            session=get_session(),
+            config_dir=API.config_dir_path
         )
         
         await STEAM_CLIENT.connect()
@@ -55,20 +57,33 @@ async def connect_and_start_client():
         players = user_data["response"].get("players", [])
         if players:
             username = players[0].get("personaname", "Unknown")
-            _LOG.info(f"Connected to Steam API for user: {username}")
+            _LOG.info("Connected to Steam API for user: %s", username)
         else:
             _LOG.warning("Connected to Steam API but no player data found")
         
         if not CURRENTLY_PLAYING_ENTITY:
-            CURRENTLY_PLAYING_ENTITY = SteamCurrentlyPlayingEntity(api=API)
+            CURRENTLY_PLAYING_ENTITY = SteamCurrentlyPlayingEntity(api=API, refresh=poll_once)
             API.available_entities.add(CURRENTLY_PLAYING_ENTITY)
             _LOG.info("Currently Playing entity created")
             
         if not FRIENDS_ENTITY:
-            FRIENDS_ENTITY = SteamFriendsEntity(api=API)
+            FRIENDS_ENTITY = SteamFriendsEntity(api=API, refresh=poll_once)
             API.available_entities.add(FRIENDS_ENTITY)
             _LOG.info("Friends entity created")
         
+        if POLLER:
+            POLLER.client = STEAM_CLIENT
+        else:
+            POLLER = SteamPoller(
+                STEAM_CLIENT,
+                CURRENTLY_PLAYING_ENTITY,
+                FRIENDS_ENTITY,
+                CONFIGURED_IDS,
+                interval=UPDATE_INTERVAL_SECONDS,
+                max_interval=MAX_UPDATE_INTERVAL_SECONDS,
+                jitter=UPDATE_JITTER_SECONDS
+            )
+        
         await API.set_device_state(DeviceStates.CONNECTED)
         _LOG.info("Device state set to CONNECTED")
         
@@ -76,38 +91,48 @@ async def connect_and_start_client():
         _LOG.exception("Failed to connect to Steam API", exc_info=e)
         await API.set_device_state(DeviceStates.ERROR)
 
-@API.listens_to(Events.CONNECT)
 async def on_connect() -> None:
     """Called when remote connects via WebSocket."""
     _LOG.info("Remote connected via WebSocket")
     if STEAM_CLIENT and CURRENTLY_PLAYING_ENTITY and FRIENDS_ENTITY:
         await API.set_device_state(DeviceStates.CONNECTED)
 
-@API.listens_to(Events.DISCONNECT)
 async def on_disconnect() -> None:
     """Called when remote disconnects."""
     _LOG.info("Remote disconnected")
 
-@API.listens_to(Events.SUBSCRIBE_ENTITIES)
 async def on_subscribe_entities(entity_ids: list[str]) -> None:
     """Called when the remote UI subscribes to our entities."""
-    _LOG.info(f"Received entity subscription for IDs: {entity_ids}")
+    _LOG.info("Received entity subscription for IDs: %s", entity_ids)
     
     entities_subscribed = False
     
     if CURRENTLY_PLAYING_ENTITY and CURRENTLY_PLAYING_ENTITY.id in entity_ids:
         API.configured_entities.add(CURRENTLY_PLAYING_ENTITY)
+        CONFIGURED_IDS.add(CURRENTLY_PLAYING_ENTITY.id)
+        CURRENTLY_PLAYING_ENTITY.mark_configured()
         entities_subscribed = True
         _LOG.info("Currently Playing entity subscribed")
         
     if FRIENDS_ENTITY and FRIENDS_ENTITY.id in entity_ids:
         API.configured_entities.add(FRIENDS_ENTITY)
+        CONFIGURED_IDS.add(FRIENDS_ENTITY.id)
+        FRIENDS_ENTITY.mark_configured()
         entities_subscribed = True
         _LOG.info("Friends entity subscribed")
     
     if entities_subscribed:
         start_update_loop()
 
+async def on_unsubscribe_entities(entity_ids: list[str]) -> None:
+    """Called when the remote UI unsubscribes from our entities."""
+    _LOG.info("Received entity unsubscription for IDs: %s", entity_ids)
+    CONFIGURED_IDS.difference_update(entity_ids)
+    
+    for entity in (CURRENTLY_PLAYING_ENTITY, FRIENDS_ENTITY):
+        if entity and entity.id in entity_ids:
+            entity.mark_configured(False)
+
 def start_update_loop():
     """Start the periodic update loop."""
     global UPDATE_TASK
@@ -115,77 +140,65 @@ def start_update_loop():
         return
     
     _LOG.info("Starting Steam data update loop...")
-    UPDATE_TASK = loop.create_task(update_loop())
+    UPDATE_TASK = asyncio.create_task(update_loop())
+
+async def poll_once() -> bool:
+    """Fetch Steam data once and update subscribed entities, returning whether anything changed."""
+    if not POLLER:
+        _LOG.warning("Update loop running but client/entities not ready")
+        return False
+    
+    return await POLLER.poll_once()
 
 async def update_loop():
     """Main update loop for Steam data."""
-    while True:
-        try:
-            if STEAM_CLIENT and (CURRENTLY_PLAYING_ENTITY or FRIENDS_ENTITY):
-                _LOG.debug("Fetching Steam data...")
-                
-                if CURRENTLY_PLAYING_ENTITY and CURRENTLY_PLAYING_ENTITY.id in [e.id for e in API.configured_entities._storage.values()]:
-                    game_data, image_url = await STEAM_CLIENT.get_currently_playing()
-                    
-                    if game_data:
-                        game_info = {
-                            "name": game_data["name"],
-                            "image_url": image_url,
-                            "appid": game_data["appid"]
-                        }
-                    else:
-                        game_info = {}
-                        
-                    await CURRENTLY_PLAYING_ENTITY.update_game_info(game_info)
-                
-                if FRIENDS_ENTITY and FRIENDS_ENTITY.id in [e.id for e in API.configured_entities._storage.values()]:
-                    online_friends = await STEAM_CLIENT.get_online_friends()
-                    
-                    friends_info = {
-                        "online_count": len(online_friends),
-                        "total_count": len(online_friends),
-                        "friends": online_friends
-                    }
-                    
-                    await FRIENDS_ENTITY.update_friends_info(friends_info)
-                    
-            else:
-                _LOG.warning("Update loop running but client/entities not ready")
-                
-        except Exception as e:
-            _LOG.exception("Error during update loop", exc_info=e)
-            
-        await asyncio.sleep(UPDATE_INTERVAL_SECONDS)
-
-SETUP_HANDLER = SteamSetup(API, CONFIG, on_setup_complete)
+    if not POLLER:
+        _LOG.warning("Update loop running but client/entities not ready")
+        return
+    
+    await POLLER.run()
 
 async def main():
     """Main entry point."""
+    global API, SETUP_HANDLER
+    
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    driver_path = str(Path(__file__).resolve().parent.parent / "driver.json")
-    await API.init(driver_path, SETUP_HANDLER.handle_command)
+    API = IntegrationAPI(asyncio.get_running_loop())
+    API.add_listener(Events.CONNECT, on_connect)
+    API.add_listener(Events.DISCONNECT, on_disconnect)
+    API.add_listener(Events.SUBSCRIBE_ENTITIES, on_subscribe_entities)
+    API.add_listener(Events.UNSUBSCRIBE_ENTITIES, on_unsubscribe_entities)
     
-    await CONFIG.load(API)
-    _LOG.info("Steam Integration Driver is up and discoverable")
-    
-    if CONFIG.steam_api_key and CONFIG.steam_id:
-        _LOG.info("Complete configuration found, attempting auto-connection...")
-        await connect_and_start_client()
-    else:
-        _LOG.info("Incomplete configuration, requiring setup")
-        await API.set_device_state(DeviceStates.DISCONNECTED)
+    # Create the shared HTTP session once so setup probes and clients reuse its connection pool
+    session = get_session()
+    SETUP_HANDLER = SteamSetup(API, CONFIG, on_setup_complete, session=session)
+
+    try:
+        driver_path = str(Path(__file__).resolve().parent.parent / "driver.json")
+        await API.init(driver_path, SETUP_HANDLER.handle_command)
+        
+        await CONFIG.load(API)
+        _LOG.info("Steam Integration Driver is up and discoverable")
+        
+        if CONFIG.steam_api_key and CONFIG.steam_id:
+            _LOG.info("Complete configuration found, attempting auto-connection...")
+            await connect_and_start_client()
+        else:
+            _LOG.info("Incomplete configuration, requiring setup")
+            await API.set_device_state(DeviceStates.DISCONNECTED)
+        
+        await asyncio.Event().wait()
+    finally:
+        if STEAM_CLIENT:
+            await STEAM_CLIENT.disconnect()
+        await close_session()
 
 if __name__ == "__main__":
     try:
-        loop.run_until_complete(main())
-        loop.run_forever()
+        asyncio.run(main())
     except KeyboardInterrupt:
         _LOG.info("Driver stopped by user")
-    finally:
-        if STEAM_CLIENT:
-            loop.run_until_complete(STEAM_CLIENT.disconnect())
-        loop.close()
\ No newline at end of file
@@ -1,12 +1,14 @@
 """
-Steam media player entities with high-resolution Steam logo caching.
+Steam media player entities with the high-resolution Steam logo.
 
 :copyright: (c) 2025 by Meir Miyara.
 :license: MPL-2.0, see LICENSE for more details.
 """
 
+import asyncio
 import logging
-from typing import Any
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable
 
 from ucapi import (
     MediaPlayer,
@@ -16,182 +18,264 @@ from ucapi import (
 
 _LOG = logging.getLogger(__name__)
 
-# Cache for Steam logo (similar to Xbox Live artwork caching)
-STEAM_LOGO_CACHE = ""
+# Attribute keys and states bound once for the update hot path
+_A_STATE = media_player.Attributes.STATE
+_A_TITLE = media_player.Attributes.MEDIA_TITLE
+_A_ARTIST = media_player.Attributes.MEDIA_ARTIST
+_A_ALBUM = media_player.Attributes.MEDIA_ALBUM
+_A_IMG = media_player.Attributes.MEDIA_IMAGE_URL
+_S_PLAYING = media_player.States.PLAYING
+_S_OFF = media_player.States.OFF
+_S_UNKNOWN = media_player.States.UNKNOWN
+
+# High-resolution Steam logo used as the friends entity artwork
+_STEAM_LOGO_URL = "https://store.steampowered.com/public/shared/images/header/logo_steam.svg"
+
+
+async def _handle_on(entity) -> StatusCodes:
+    """Refresh Steam data for the entity."""
+    _LOG.info("Refreshing Steam data on user command.")
+    await entity.trigger_update()
+    return StatusCodes.OK
+
+
+async def _handle_noop(entity) -> StatusCodes:
+    """Acknowledge a command that has nothing to do."""
+    return StatusCodes.OK
+
+
+_CMD_TABLE: dict[str, Callable[[Any], Awaitable[StatusCodes]]] = {
+    media_player.Commands.ON: _handle_on,
+    media_player.Commands.OFF: _handle_noop,
+    media_player.Commands.PLAY_PAUSE: _handle_noop,
+}
 
 
 async def steam_command_handler(entity, command: str, params: dict[str, Any] | None = None) -> StatusCodes:
     """Command handler for Steam entities."""
-    _LOG.info(f"Steam command received: {command}")
-
-    if command == media_player.Commands.ON:
-        _LOG.info("Refreshing Steam data on user command.")
-        if hasattr(entity, 'trigger_update'):
-            await entity.trigger_update()
-        return StatusCodes.OK
-    elif command in [media_player.Commands.OFF, media_player.Commands.PLAY_PAUSE]:
-        return StatusCodes.OK
-    else:
-        return StatusCodes.NOT_IMPLEMENTED
+    _LOG.info("Steam command received: %s", command)
 
+    handler = _CMD_TABLE.get(command)
+    if handler is None:
+        return StatusCodes.NOT_IMPLEMENTED
+    return await handler(entity)
 
-def get_steam_logo_url() -> str:
-    """Get cached high-resolution Steam logo URL."""
-    global STEAM_LOGO_CACHE
-    
-    if not STEAM_LOGO_CACHE:
-        # Cache the high-resolution Steam logo URL (like Xbox Live does for artwork)
-        STEAM_LOGO_CACHE = "https://store.steampowered.com/public/shared/images/header/logo_steam.svg"
-        _LOG.debug("Cached Steam logo URL")
-    
-    return STEAM_LOGO_CACHE
 
+class _SteamMediaPlayerBase(MediaPlayer, ABC):
+    """Shared scaffolding for the Steam media player entities."""
 
-class SteamCurrentlyPlayingEntity(MediaPlayer):
-    """Steam currently playing game entity."""
+    # Attribute templates keyed by "playing", "off" and "error" - only the artist/image fields vary per update
+    _TEMPLATES: dict[str, dict[str, Any]] = {}
+    _LABEL = "Steam"
 
-    def __init__(self, api=None):
-        """Initialize currently playing entity."""
-        features = [media_player.Features.ON_OFF]
-        
-        initial_attributes = {
-            media_player.Attributes.STATE: media_player.States.ON,
-            media_player.Attributes.MEDIA_TITLE: "Steam - Now Playing",
-            media_player.Attributes.MEDIA_ARTIST: "No game detected",
-            media_player.Attributes.MEDIA_ALBUM: "Steam",
-            media_player.Attributes.MEDIA_IMAGE_URL: "",
-        }
-        
+    def __init__(
+        self,
+        identifier: str,
+        name: str,
+        initial_attributes: dict[str, Any],
+        api=None,
+        refresh: Callable[[], Awaitable[Any]] | None = None
+    ):
+        """Initialize entity."""
         super().__init__(
-            identifier="steam_currently_playing",
-            name="Steam - Now Playing",
-            features=features,
+            identifier=identifier,
+            name=name,
+            features=[media_player.Features.ON_OFF],
             attributes=initial_attributes,
             cmd_handler=steam_command_handler,
             device_class=media_player.DeviceClasses.RECEIVER
         )
         
         self._api = api
+        self._last_payload_hash: int | None = None
+        self._is_configured = False
+        self._refresh = refresh
+        self._refresh_task: asyncio.Task | None = None
 
     async def trigger_update(self):
         """Trigger an immediate update when user presses ON button."""
-        _LOG.info("User triggered Steam currently playing update")
+        _LOG.info("User triggered Steam %s update", self._LABEL)
+        
+        # The refresh callback joins any poll already in flight, so one pending refresh per entity is enough
+        if self._refresh is None or (self._refresh_task and not self._refresh_task.done()):
+            return
+        
+        self._refresh_task = asyncio.create_task(self._run_refresh())
 
-    async def update_game_info(self, game_info: dict[str, Any]) -> None:
-        """Update entity with current game information."""
-        new_attributes = self.attributes.copy()
+    async def _run_refresh(self):
+        """Run the refresh callback."""
+        try:
+            await self._refresh()
+        except Exception as e:
+            _LOG.error("Error refreshing Steam %s: %s", self._LABEL, e)
+
+    def _update_from_payload(self, payload_hash: int, payload: dict[str, Any]) -> bool:
+        """Apply a payload unless its hash matches the last one, returning whether anything changed."""
+        if payload_hash == self._last_payload_hash:
+            _LOG.debug("Steam %s unchanged, skipping entity update", self._LABEL)
+            return False
         
         try:
-            if game_info and "name" in game_info:
-                new_attributes.update({
-                    media_player.Attributes.STATE: media_player.States.PLAYING,
-                    media_player.Attributes.MEDIA_TITLE: "Steam - Now Playing",
-                    media_player.Attributes.MEDIA_ARTIST: game_info["name"],
-                    media_player.Attributes.MEDIA_ALBUM: "Playing on Steam",
-                    media_player.Attributes.MEDIA_IMAGE_URL: game_info.get("image_url", ""),
-                })
-                _LOG.info("Now playing: %s", game_info["name"])
-            else:
-                new_attributes.update({
-                    media_player.Attributes.STATE: media_player.States.OFF,
-                    media_player.Attributes.MEDIA_TITLE: "Steam - Now Playing",
-                    media_player.Attributes.MEDIA_ARTIST: "No game detected", 
-                    media_player.Attributes.MEDIA_ALBUM: "Steam",
-                    media_player.Attributes.MEDIA_IMAGE_URL: "",
-                })
-                _LOG.debug("No game currently playing")
-                    
+            new_attributes = self._build_delta(payload)
+            self._last_payload_hash = payload_hash
         except Exception as e:
-            _LOG.error("Error updating currently playing entity: %s", e)
-            new_attributes.update({
-                media_player.Attributes.STATE: media_player.States.UNKNOWN,
-                media_player.Attributes.MEDIA_TITLE: "Steam - Now Playing",
-                media_player.Attributes.MEDIA_ARTIST: "Steam API Error",
-                media_player.Attributes.MEDIA_ALBUM: "Check connection",
-                media_player.Attributes.MEDIA_IMAGE_URL: "",
-            })
-
-        self.attributes.update(new_attributes)
+            _LOG.error("Error updating Steam %s entity: %s", self._LABEL, e)
+            new_attributes = self._TEMPLATES["error"]
+            # Forget the payload so the same data is retried instead of leaving the error showing
+            self._last_payload_hash = None
+
+        self._apply_update(new_attributes)
+        return True
+
+    @abstractmethod
+    def _build_delta(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Build the attributes for a payload."""
+
+    def _apply_update(self, new_attributes: dict[str, Any]) -> None:
+        """Apply and push only the attributes that differ from the current ones."""
+        # Write each changed key straight into the live attributes while collecting the delta
+        attributes = self.attributes
+        delta = {}
+        for key, value in new_attributes.items():
+            if attributes.get(key) != value:
+                attributes[key] = value
+                delta[key] = value
+
+        if delta and self._is_configured and self._api is not None:
+            self._api.configured_entities.update_attributes(self.id, delta)
+
+    def mark_configured(self, configured: bool = True) -> None:
+        """Record whether the remote has subscribed to this entity."""
+        self._is_configured = configured
+
+
+class SteamCurrentlyPlayingEntity(_SteamMediaPlayerBase):
+    """Steam currently playing game entity."""
+
+    _TEMPLATES = {
+        "playing": {
+            _A_STATE: _S_PLAYING,
+            _A_TITLE: "Steam - Now Playing",
+            _A_ALBUM: "Playing on Steam",
+        },
+        "off": {
+            _A_STATE: _S_OFF,
+            _A_TITLE: "Steam - Now Playing",
+            _A_ARTIST: "No game detected",
+            _A_ALBUM: "Steam",
+            _A_IMG: "",
+        },
+        "error": {
+            _A_STATE: _S_UNKNOWN,
+            _A_TITLE: "Steam - Now Playing",
+            _A_ARTIST: "Steam API Error",
+            _A_ALBUM: "Check connection",
+            _A_IMG: "",
+        },
+    }
+    _LABEL = "currently playing"
+
+    def __init__(self, api=None, refresh: Callable[[], Awaitable[Any]] | None = None):
+        """Initialize currently playing entity."""
+        initial_attributes = {
+            _A_STATE: media_player.States.ON,
+            _A_TITLE: "Steam - Now Playing",
+            _A_ARTIST: "No game detected",
+            _A_ALBUM: "Steam",
+            _A_IMG: "",
+        }
         
-        if self._api and self._api.configured_entities.contains(self.id):
-            self._api.configured_entities.update_attributes(self.id, self.attributes)
+        super().__init__("steam_currently_playing", "Steam - Now Playing", initial_attributes, api, refresh)
 
+    async def update_game_info(self, game_info: dict[str, Any]) -> bool:
+        """Update entity with current game information, returning whether anything changed."""
+        payload_hash = hash((game_info.get("appid"), game_info.get("name"), game_info.get("image_url")))
+        return self._update_from_payload(payload_hash, game_info)
 
-class SteamFriendsEntity(MediaPlayer):
+    def _build_delta(self, game_info: dict[str, Any]) -> dict[str, Any]:
+        """Build the attributes for the current game."""
+        if game_info and "name" in game_info:
+            _LOG.info("Now playing: %s", game_info["name"])
+            return {
+                **self._TEMPLATES["playing"],
+                _A_ARTIST: game_info["name"],
+                _A_IMG: game_info.get("image_url", ""),
+            }
+        
+        _LOG.debug("No game currently playing")
+        return self._TEMPLATES["off"]
+
+
+class SteamFriendsEntity(_SteamMediaPlayerBase):
     """Steam friends list entity with high-resolution Steam logo."""
 
-    def __init__(self, api=None):
+    _TEMPLATES = {
+        "playing": {
+            _A_STATE: _S_PLAYING,
+            _A_TITLE: "Steam - Friends",
+            _A_IMG: _STEAM_LOGO_URL,
+        },
+        "off": {
+            _A_STATE: _S_OFF,
+            _A_TITLE: "Steam - Friends",
+            _A_ARTIST: "No friends data",
+            _A_ALBUM: "Steam",
+            _A_IMG: _STEAM_LOGO_URL,
+        },
+        "error": {
+            _A_STATE: _S_UNKNOWN,
+            _A_TITLE: "Steam - Friends",
+            _A_ARTIST: "Connection Error",
+            _A_ALBUM: "Steam",
+            _A_IMG: _STEAM_LOGO_URL,
+        },
+    }
+    _LABEL = "friends"
+
+    def __init__(self, api=None, refresh: Callable[[], Awaitable[Any]] | None = None):
         """Initialize friends entity."""
-        features = [media_player.Features.ON_OFF]
-        
-        # Use cached high-resolution Steam logo (like Xbox Live pattern)
-        steam_logo_url = get_steam_logo_url()
-        
         initial_attributes = {
-            media_player.Attributes.STATE: media_player.States.ON,
-            media_player.Attributes.MEDIA_TITLE: "Steam - Friends",
-            media_player.Attributes.MEDIA_ARTIST: "Loading...",
-            media_player.Attributes.MEDIA_ALBUM: "Fetching friends...",
-            media_player.Attributes.MEDIA_IMAGE_URL: steam_logo_url,
+            _A_STATE: media_player.States.ON,
+            _A_TITLE: "Steam - Friends",
+            _A_ARTIST: "Loading...",
+            _A_ALBUM: "Fetching friends...",
+            _A_IMG: _STEAM_LOGO_URL,
         }
         
-        super().__init__(
-            identifier="steam_friends",
-            name="Steam - Friends",
-            features=features,
-            attributes=initial_attributes,
-            cmd_handler=steam_command_handler,
-            device_class=media_player.DeviceClasses.RECEIVER
-        )
+        super().__init__("steam_friends", "Steam - Friends", initial_attributes, api, refresh)
         
-        self._api = api
+        self._last_counts: tuple[int, int] | None = None
+        self._last_friends_strings: tuple[str, str] | None = None
 
-    async def trigger_update(self):
-        """Trigger an immediate update when user presses ON button."""
-        _LOG.info("User triggered Steam friends update")
+    async def update_friends_info(self, friends_info: dict[str, Any]) -> bool:
+        """Update entity with friends information, returning whether anything changed."""
+        payload_hash = hash((
+            friends_info.get("online_count"),
+            friends_info.get("total_count"),
+            tuple(
+                (friend.get("steamid"), friend.get("personastate"), friend.get("gameid"))
+                for friend in friends_info.get("friends", [])
+            )
+        ))
+        return self._update_from_payload(payload_hash, friends_info)
 
-    async def update_friends_info(self, friends_info: dict[str, Any]) -> None:
-        """Update entity with friends information."""
-        new_attributes = self.attributes.copy()
-        
-        # Always use cached Steam logo (like Xbox Live artwork handling)
-        steam_logo_url = get_steam_logo_url()
-        
-        try:
-            if friends_info and "online_count" in friends_info:
-                online_count = friends_info["online_count"]
-                total_count = friends_info.get("total_count", online_count)
-                
-                new_attributes.update({
-                    media_player.Attributes.STATE: media_player.States.PLAYING,
-                    media_player.Attributes.MEDIA_TITLE: "Steam - Friends",
-                    media_player.Attributes.MEDIA_ARTIST: f"{online_count} friends online",
-                    media_player.Attributes.MEDIA_ALBUM: f"Total: {total_count}",
-                    media_player.Attributes.MEDIA_IMAGE_URL: steam_logo_url,
-                })
-                
-                _LOG.info("Friends online: %d/%d", online_count, total_count)
+    def _build_delta(self, friends_info: dict[str, Any]) -> dict[str, Any]:
+        """Build the attributes for the online friends counts."""
+        if friends_info and "online_count" in friends_info:
+            online_count = friends_info["online_count"]
+            total_count = friends_info.get("total_count", online_count)
+            
+            counts = (online_count, total_count)
+            if counts == self._last_counts:
+                artist, album = self._last_friends_strings
             else:
-                new_attributes.update({
-                    media_player.Attributes.STATE: media_player.States.OFF,
-                    media_player.Attributes.MEDIA_TITLE: "Steam - Friends",
-                    media_player.Attributes.MEDIA_ARTIST: "No friends data",
-                    media_player.Attributes.MEDIA_ALBUM: "Steam",
-                    media_player.Attributes.MEDIA_IMAGE_URL: steam_logo_url,
-                })
-                _LOG.debug("No friends data available")
+                artist = "%d friends online" % online_count
+                album = "Total: %d" % total_count
+                self._last_counts = counts
+                self._last_friends_strings = (artist, album)
             
-        except Exception as e:
-            _LOG.error("Error updating friends entity: %s", e)
-            new_attributes.update({
-                media_player.Attributes.STATE: media_player.States.UNKNOWN,
-                media_player.Attributes.MEDIA_TITLE: "Steam - Friends",
-                media_player.Attributes.MEDIA_ARTIST: "Connection Error",
-                media_player.Attributes.MEDIA_ALBUM: "Steam",
-                media_player.Attributes.MEDIA_IMAGE_URL: steam_logo_url,
-            })
-
-        self.attributes.update(new_attributes)
+            _LOG.info("Friends online: %d/%d", online_count, total_count)
+            return {**self._TEMPLATES["playing"], _A_ARTIST: artist, _A_ALBUM: album}
         
-        if self._api and self._api.configured_entities.contains(self.id):
-            self._api.configured_entities.update_attributes(self.id, self.attributes)
\ No newline at end of file
+        _LOG.debug("No friends data available")
+        return self._TEMPLATES["off"]
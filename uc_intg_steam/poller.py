@@ -0,0 +1,127 @@
+"""
+Shared Steam poll loop feeding both media player entities.
+
+:copyright: (c) 2025 by Meir Miyara.
+:license: MPL-2.0, see LICENSE for more details.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Optional
+
+from uc_intg_steam.client import SteamClient
+from uc_intg_steam.media_player import SteamCurrentlyPlayingEntity, SteamFriendsEntity
+from uc_intg_steam.scheduler import AdaptivePollScheduler
+
+_LOG = logging.getLogger(__name__)
+
+
+class SteamPoller:
+    """Fetch Steam data once per poll and dispatch it to every subscribed entity."""
+
+    def __init__(
+        self,
+        client: SteamClient,
+        playing_entity: Optional[SteamCurrentlyPlayingEntity] = None,
+        friends_entity: Optional[SteamFriendsEntity] = None,
+        subscribed_ids: Optional[set[str]] = None,
+        interval: float = 30,
+        max_interval: float = 120,
+        jitter: float = 3
+    ):
+        """Initialize poller."""
+        self.client = client
+        self.playing_entity = playing_entity
+        self.friends_entity = friends_entity
+        self.subscribed_ids = subscribed_ids if subscribed_ids is not None else set()
+        self.interval = interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.scheduler = AdaptivePollScheduler(interval, max_interval=max_interval)
+        self._poll_task: Optional[asyncio.Task] = None
+        self._changed_since_run = False
+
+    async def poll_once(self) -> bool:
+        """Fetch Steam data once and update subscribed entities, returning whether anything changed.
+
+        Callers arriving while a poll is in flight join it instead of starting another.
+        """
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.create_task(self._poll())
+        return await asyncio.shield(self._poll_task)
+
+    async def _poll(self) -> bool:
+        """Run a single poll and record its outcome for the scheduler."""
+        playing = self.playing_entity if self.playing_entity and self.playing_entity.id in self.subscribed_ids else None
+        friends = self.friends_entity if self.friends_entity and self.friends_entity.id in self.subscribed_ids else None
+        if not playing and not friends:
+            _LOG.debug("No subscribed Steam entities, skipping poll")
+            return False
+
+        _LOG.debug("Fetching Steam data...")
+        # One round of summary requests covers the owner and the friends, skipping whichever is unsubscribed
+        (game_data, image_url), online_friends = await self.client.refresh_all(
+            include_playing=playing is not None,
+            include_friends=friends is not None
+        )
+
+        updates = []
+        if playing:
+            if game_data:
+                game_info = {
+                    "name": game_data["name"],
+                    "image_url": image_url,
+                    "appid": game_data["appid"]
+                }
+            else:
+                game_info = {}
+            updates.append(playing.update_game_info(game_info))
+
+        if friends:
+            friends_info = {
+                "online_count": len(online_friends),
+                "total_count": len(online_friends),
+                "friends": online_friends
+            }
+            updates.append(friends.update_friends_info(friends_info))
+
+        changed = any(await asyncio.gather(*updates))
+        # Every poll feeds the schedule, including ones triggered by the user
+        self.scheduler.record_poll(changed)
+        if changed:
+            self._changed_since_run = True
+        return changed
+
+    async def run(self):
+        """Poll until cancelled."""
+        interval = self.interval
+
+        while True:
+            try:
+                # API errors are absorbed and rate-limited in the client, only unexpected ones land here
+                await self.poll_once()
+            except Exception as e:
+                _LOG.exception("Error during update loop", exc_info=e)
+
+            # Changes found by user-triggered polls since the last wake-up count too
+            changed = self._changed_since_run
+            self._changed_since_run = False
+
+            # Back off while nothing changes or polls fail, jitter to step off Steam's own cache cadence
+            if changed:
+                interval = self.interval
+            else:
+                interval = min(interval * 2, self.max_interval)
+
+            # Once enough state changes have been seen, place polls where changes are likely instead
+            try:
+                delay = self.scheduler.next_delay()
+            except Exception as e:
+                # A scheduling bug must not stop the loop - fall back to the plain backoff
+                _LOG.warning("Adaptive poll scheduling failed, using backoff: %s", e)
+                delay = None
+            if delay is None:
+                delay = interval + random.uniform(-self.jitter, self.jitter)
+            _LOG.debug("Next Steam update in %.1fs", delay)
+            await asyncio.sleep(delay)
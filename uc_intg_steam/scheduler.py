@@ -0,0 +1,123 @@
+"""
+Adaptive poll scheduling based on observed Steam state changes.
+
+:copyright: (c) 2025 by Meir Miyara.
+:license: MPL-2.0, see LICENSE for more details.
+"""
+
+import bisect
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+_LOG = logging.getLogger(__name__)
+
+
+class AdaptivePollScheduler:
+    """Place polls where state changes are most likely, within a fixed poll budget."""
+
+    def __init__(
+        self,
+        base_interval: float,
+        min_interval: Optional[float] = None,
+        max_interval: float = 120,
+        min_samples: int = 20,
+        max_samples: int = 200,
+        bins: int = 20
+    ):
+        """Initialize scheduler."""
+        self.base_interval = base_interval
+        # Polls never come closer together than the fixed interval they replace
+        self.min_interval = base_interval if min_interval is None else min_interval
+        self.max_interval = max_interval
+        self.min_samples = min_samples
+        self.bins = bins
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self._last_change: Optional[float] = None
+        self._schedule: list[float] = []
+
+    def record_poll(self, changed: bool, now: Optional[float] = None) -> None:
+        """Record the outcome of a poll."""
+        if not changed:
+            return
+
+        now = time.monotonic() if now is None else now
+        if self._last_change is not None:
+            self._samples.append(now - self._last_change)
+            self._schedule = []
+        self._last_change = now
+
+    def next_delay(self, now: Optional[float] = None) -> Optional[float]:
+        """Get seconds until the next poll, or None while there is too little history."""
+        if self._last_change is None or len(self._samples) < self.min_samples:
+            return None
+
+        if not self._schedule:
+            self._schedule = self._compute_schedule()
+            _LOG.debug("Adaptive poll schedule: %s", [round(point, 1) for point in self._schedule])
+
+        elapsed = (time.monotonic() if now is None else now) - self._last_change
+        index = bisect.bisect_right(self._schedule, elapsed)
+        if index >= len(self._schedule):
+            return self.max_interval
+
+        return min(max(self._schedule[index] - elapsed, self.min_interval), self.max_interval)
+
+    def _compute_schedule(self) -> list[float]:
+        """Compute poll times since the last change from the inter-change histogram.
+
+        Uses the optimality condition p(L_i) * (L_{i+1} - L_i) = F(L_i) - F(L_{i-1})
+        and searches the first poll time so that the k-th poll lands on the 99th
+        percentile U. The schedule restarts at every change, so k is the number of
+        fixed-interval polls in a mean gap, keeping the same budget per change.
+        """
+        samples = sorted(self._samples)
+        upper = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+        if upper <= 0:
+            return [self.base_interval]
+
+        width = upper / self.bins
+        counts = [0] * self.bins
+        for sample in samples:
+            if sample <= upper:
+                counts[min(int(sample / width), self.bins - 1)] += 1
+
+        total = sum(counts)
+        # Floor keeps the recurrence finite across empty bins
+        floor = 0.01 / upper
+        densities = [max(count / (total * width), floor) for count in counts]
+        cumulative = [0.0]
+        for count in counts:
+            cumulative.append(cumulative[-1] + count / total)
+
+        def pdf(t: float) -> float:
+            return densities[min(int(t / width), self.bins - 1)]
+
+        def cdf(t: float) -> float:
+            if t >= upper:
+                return 1.0
+            # Rounding can put t just below U into bin `bins`, clamp like pdf does
+            index = min(int(t / width), self.bins - 1)
+            return cumulative[index] + (t - index * width) * counts[index] / (total * width)
+
+        polls = max(1, round(sum(samples) / len(samples) / self.base_interval))
+
+        def schedule_from(first: float) -> list[float]:
+            points = [0.0, first]
+            while len(points) <= polls and points[-1] <= upper:
+                previous, current = points[-2], points[-1]
+                points.append(current + (cdf(current) - cdf(previous)) / pdf(current))
+            return points[1:]
+
+        # Largest first poll whose k-th poll still lands within U
+        low, high = 0.0, upper
+        for _ in range(40):
+            middle = (low + high) / 2
+            if schedule_from(middle)[-1] <= upper:
+                low = middle
+            else:
+                high = middle
+
+        schedule = sorted({point for point in schedule_from(low) if 0 < point <= upper})
+        return schedule or [self.base_interval]
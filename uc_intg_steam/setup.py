@@ -1,5 +1,9 @@
+import asyncio
 import logging
+import re
+import time
 import aiohttp
+from yarl import URL
 from ucapi import (
     DriverSetupRequest,
     AbortDriverSetup,
@@ -11,20 +15,48 @@ from ucapi import (
 )
 
 import uc_intg_steam.config as steam_config
+from uc_intg_steam.client import get_session
 
 _LOG = logging.getLogger("STEAM_SETUP")
 
+_SUMMARIES_URL = URL("https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v0002/")
+
+_STEAM_ID_RE = re.compile(r"[1-9][0-9]{0,19}")
+
+# SetupError is only read by the API layer, so one shared instance per error type is enough
+_SETUP_ERROR_OTHER = SetupError(IntegrationSetupError.OTHER)
+_SETUP_ERROR_AUTH = SetupError(IntegrationSetupError.AUTHORIZATION_ERROR)
+
+PROBE_CACHE_TTL = 60
+MAX_PROBE_BACKOFF = 60
+PROBE_PREFIX_BYTES = 512
+PROBE_TIMEOUT = 10
+
 class SteamSetup:
     """Steam integration setup handler."""
     
-    def __init__(self, api, config: steam_config.SteamConfig, on_setup_complete):
+    def __init__(self, api, config: steam_config.SteamConfig, on_setup_complete, session: aiohttp.ClientSession | None = None):
         self.api = api
         self.config = config
         self.on_setup_complete = on_setup_complete
+        self._session = session
+        # Successful probes per (api_key, steam_id): monotonic timestamp of the check
+        self._probe_cache: dict[tuple[str, str], float] = {}
+        self._consecutive_failures = 0
+        self._next_retry_at = 0.0
+        self._failed_credentials: tuple[str, str] | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """HTTP session for setup probes, shared with the Steam client."""
+        if self._session is None or self._session.closed:
+            self._session = get_session()
+        return self._session
 
     async def handle_command(self, request):
         """Handle setup commands from the Remote Two."""
-        _LOG.info(f"Handling setup command: {type(request)}")
+        if _LOG.isEnabledFor(logging.INFO):
+            _LOG.info("Handling setup command: %s", type(request))
         
         if isinstance(request, DriverSetupRequest):
             return await self._handle_driver_setup_request(request)
@@ -38,8 +70,8 @@ class SteamSetup:
         if isinstance(request, AbortDriverSetup):
             return await self._handle_abort_setup(request)
         
-        _LOG.warning(f"Unhandled setup request type: {type(request)}")
-        return SetupError(IntegrationSetupError.OTHER)
+        _LOG.warning("Unhandled setup request type: %s", type(request))
+        return _SETUP_ERROR_OTHER
 
     async def _handle_driver_setup_request(self, request: DriverSetupRequest):
         """Handle initial driver setup request."""
@@ -50,23 +82,19 @@ class SteamSetup:
         
         if not steam_api_key:
             _LOG.error("Missing Steam API key")
-            return SetupError(IntegrationSetupError.OTHER)
+            return _SETUP_ERROR_OTHER
             
         if not steam_id:
             _LOG.error("Missing Steam ID")
-            return SetupError(IntegrationSetupError.OTHER)
+            return _SETUP_ERROR_OTHER
         
-        try:
-            steam_id_int = int(steam_id)
-            if steam_id_int <= 0:
-                raise ValueError("Invalid Steam ID")
-        except ValueError:
-            _LOG.error(f"Invalid Steam ID format: {steam_id}")
-            return SetupError(IntegrationSetupError.OTHER)
+        if not _STEAM_ID_RE.fullmatch(steam_id):
+            _LOG.error("Invalid Steam ID format: %s", steam_id)
+            return _SETUP_ERROR_OTHER
         
         if not await self._test_steam_api_connection(steam_api_key, steam_id):
             _LOG.error("Failed to connect to Steam API with provided credentials")
-            return SetupError(IntegrationSetupError.AUTHORIZATION_ERROR)
+            return _SETUP_ERROR_AUTH
         
         self.config.steam_api_key = steam_api_key
         self.config.steam_id = steam_id
@@ -77,48 +105,96 @@ class SteamSetup:
             await self.on_setup_complete()
             return SetupComplete()
         except Exception as e:
-            _LOG.error(f"Failed to save configuration: {e}")
-            return SetupError(IntegrationSetupError.OTHER)
+            _LOG.error("Failed to save configuration: %s", e)
+            return _SETUP_ERROR_OTHER
 
     async def _handle_user_data_response(self, request: UserDataResponse):
         """Handle user data input during setup."""
         _LOG.info("Processing user data response")
-        return SetupError(IntegrationSetupError.OTHER)
+        return _SETUP_ERROR_OTHER
 
     async def _handle_user_confirmation_response(self, request: UserConfirmationResponse):
         """Handle user confirmation during setup."""
         _LOG.info("Processing user confirmation response")
-        return SetupError(IntegrationSetupError.OTHER)
+        return _SETUP_ERROR_OTHER
 
     async def _handle_abort_setup(self, request: AbortDriverSetup):
         """Handle setup abortion."""
-        _LOG.info(f"Setup aborted: {request.error}")
+        _LOG.info("Setup aborted: %s", request.error)
         return
 
     async def _test_steam_api_connection(self, api_key: str, steam_id: str) -> bool:
-        """Test if we can connect to Steam API with provided credentials."""
-        try:
-            url = "http://api.steampowered.com/ISteamUser/GetPlayerSummaries/v0002/"
-            params = {
-                "key": api_key,
-                "steamids": steam_id
+        """Test if we can connect to Steam API with provided credentials, reusing recent results."""
+        cache_key = (api_key, steam_id)
+        
+        # Backoff decides retries of failing credentials; only successes ever reach the cache
+        if cache_key != self._failed_credentials:
+            # New credentials deserve a fresh attempt
+            self._consecutive_failures = 0
+            self._next_retry_at = 0.0
+        elif time.monotonic() < self._next_retry_at:
+            _LOG.debug("Steam API test backing off for %.0fs", self._next_retry_at - time.monotonic())
+            return False
+        
+        validated_at = self._probe_cache.get(cache_key)
+        if validated_at is not None and time.monotonic() - validated_at < PROBE_CACHE_TTL:
+            _LOG.info("Using cached Steam API test result")
+            return True
+        
+        result = await self._probe_steam_api(api_key, steam_id)
+        
+        if result:
+            # Only successes are cached - a failure may be transient or fixed by the user at any time
+            now = time.monotonic()
+            self._probe_cache = {
+                key: ts for key, ts in self._probe_cache.items() if now - ts < PROBE_CACHE_TTL
             }
+            self._probe_cache[cache_key] = now
+            self._consecutive_failures = 0
+            self._next_retry_at = 0.0
+            self._failed_credentials = None
+        else:
+            self._consecutive_failures += 1
+            self._next_retry_at = time.monotonic() + min(MAX_PROBE_BACKOFF, 2 ** self._consecutive_failures)
+            self._failed_credentials = cache_key
+        return result
+
+    def _log_probe_failure(self, msg: str, *args) -> None:
+        """Log a probe failure, downgrading repeats to debug to avoid log spam."""
+        level = logging.DEBUG if self._consecutive_failures else logging.ERROR
+        _LOG.log(level, msg, *args)
+
+    async def _probe_steam_api(self, api_key: str, steam_id: str) -> bool:
+        """Probe the Steam API with provided credentials."""
+        try:
+            url = _SUMMARIES_URL.with_query(key=api_key, steamids=steam_id, format="json")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=10) as response:
+            # One deadline covers DNS, connect and the body read
+            async with asyncio.timeout(PROBE_TIMEOUT):
+                async with self.session.get(url) as response:
                     if response.status == 200:
-                        data = await response.json()
-                        players = data.get("response", {}).get("players", [])
-                        if players:
-                            _LOG.info(f"Steam API test successful for user: {players[0].get('personaname', 'Unknown')}")
+                        # A returned player always carries "steamid" near the start of the body
+                        prefix = b""
+                        while len(prefix) < PROBE_PREFIX_BYTES:
+                            chunk = await response.content.read(PROBE_PREFIX_BYTES - len(prefix))
+                            if not chunk:
+                                break
+                            prefix += chunk
+                    
+                        # Drain the rest unparsed so the keep-alive connection goes back to the pool
+                        await response.content.read()
+                    
+                        if b'"steamid"' in prefix:
+                            # The username is logged once the client connects, no need to parse the body here
+                            _LOG.info("Steam API test successful for Steam ID %s", steam_id)
                             return True
                         else:
-                            _LOG.error("Steam API returned no player data")
+                            self._log_probe_failure("Steam API returned no player data")
                             return False
                     else:
-                        _LOG.error(f"Steam API test failed with status: {response.status}")
+                        self._log_probe_failure("Steam API test failed with status: %s", response.status)
                         return False
                         
         except Exception as e:
-            _LOG.error(f"Steam API test failed: {e}")
+            self._log_probe_failure("Steam API test failed: %s", e)
             return False
\ No newline at end of file